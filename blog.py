@@ -1,110 +1,270 @@
 import streamlit as st
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from googleapiclient.discovery import build
 import re
 from dotenv import load_dotenv
-from youtube_transcript_api import YouTubeTranscriptApi
-from pytube import YouTube
+from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
 import os
-import whisper
+import sys
+import subprocess
+import tempfile
+from faster_whisper import WhisperModel
+import ctranslate2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import time
+import asyncio
+import hashlib
+import json
+import tiktoken
+import httpx
+
+# gather_all relies on asyncio.TaskGroup and exception groups
+if sys.version_info < (3, 11):
+    raise RuntimeError("This app requires Python 3.11 or newer")
 
 # Load environment variables
 load_dotenv()
 
+# API keys
+OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
+YOUTUBE_API_KEY = st.secrets["YOUTUBE_API_KEY"]
+
+# Streamlit re-executes this script on every interaction, so long-lived clients
+# and the event loop they are bound to are kept in the session state
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+
+def get_event_loop():
+    """Event loop for this session; the pooled OpenAI connections belong to it"""
+    if "event_loop" not in st.session_state:
+        st.session_state.event_loop = asyncio.new_event_loop()
+    return st.session_state.event_loop
+
+def run_async(coro):
+    """Run a coroutine to completion on this session's event loop"""
+    loop = get_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        # Like asyncio.run, cancel whatever is left so an interrupted run (a rerun, an
+        # OpenAI error) never resumes on this loop during the next call
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+async def gather_all(coros):
+    """Run coroutines concurrently and return their results in order
+
+    If one fails, the others are cancelled and its exception is raised as-is, so
+    Streamlit still recognises its own rerun/stop exceptions.
+    """
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(coro) for coro in coros]
+    except BaseExceptionGroup as errors:
+        raise errors.exceptions[0] from None
+    return [task.result() for task in tasks]
+
+def get_openai_client():
+    """OpenAI client for this session, reusing HTTP/2 connections across reruns"""
+    if "openai_client" not in st.session_state:
+        st.session_state.openai_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=DefaultAsyncHttpxClient(http2=True, limits=HTTP_LIMITS)
+        )
+    return st.session_state.openai_client
+
+def get_youtube_client():
+    """YouTube API client for this session, reusing its HTTP connection across reruns"""
+    if "youtube_client" not in st.session_state:
+        st.session_state.youtube_client = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    return st.session_state.youtube_client
+
 # Set up OpenAI client
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+client = get_openai_client()
 
 # Set up YouTube API client
-YOUTUBE_API_KEY = st.secrets["YOUTUBE_API_KEY"]
-youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+youtube = get_youtube_client()
+
+# OpenAI model used for every completion; part of the article cache key
+MODEL = "gpt-4o-2024-11-20"
+
+# Matches watch, embed, /v/ and youtu.be URLs in a single scan
+_VIDEO_ID_RE = re.compile(r'(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)([\w-]+)')
 
 def extract_video_id(url):
     """Extract YouTube video ID from URL"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu.be\/)([\w-]+)',
-        r'(?:youtube\.com\/embed\/)([\w-]+)',
-        r'(?:youtube\.com\/v\/)([\w-]+)'
-    ]
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
+# A stalled connection is dropped after SOCKET_TIMEOUT_SECONDS; the whole
+# download and decode must finish within AUDIO_TIMEOUT_SECONDS
+SOCKET_TIMEOUT_SECONDS = 30
+AUDIO_TIMEOUT_SECONDS = 900
+
+# yt-dlp arguments for streaming the audio track to stdout; yt-dlp handles its own retries
+YDL_ARGS = [
+    "-f", "bestaudio/best", "--quiet", "--no-progress",
+    "--concurrent-fragments", "8", "--socket-timeout", str(SOCKET_TIMEOUT_SECONDS)
+]
+
+# Long audio is cut into chunks that are transcribed in parallel
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 120
+SILENCE_SEARCH_SECONDS = 10
+CUDA_DEVICES = ctranslate2.get_cuda_device_count()
+WORKERS_PER_GPU = 2
+TRANSCRIBE_WORKERS = CUDA_DEVICES * WORKERS_PER_GPU if CUDA_DEVICES else min(os.cpu_count() or 1, 4)
+
+@st.cache_resource(show_spinner=False)
+def load_whisper_model(name="base"):
+    """Load the Whisper model once per process and share it across reruns and sessions"""
+    # float16 replicas on every GPU, or quantized int8 on CPU; num_workers allows
+    # concurrent transcribe calls and applies per device. On CPU the cores are split
+    # between the workers so they do not oversubscribe the machine
+    if CUDA_DEVICES:
+        return WhisperModel(
+            name,
+            device="cuda",
+            compute_type="float16",
+            device_index=list(range(CUDA_DEVICES)),
+            num_workers=WORKERS_PER_GPU
+        )
+    return WhisperModel(
+        name,
+        device="cpu",
+        compute_type="int8",
+        num_workers=TRANSCRIBE_WORKERS,
+        cpu_threads=max(1, (os.cpu_count() or 1) // TRANSCRIBE_WORKERS)
+    )
+
+def split_on_silence(audio, sample_rate=SAMPLE_RATE):
+    """Split audio into ~CHUNK_SECONDS pieces, cutting at the quietest point near each boundary"""
+    chunk_len = CHUNK_SECONDS * sample_rate
+    search_len = SILENCE_SEARCH_SECONDS * sample_rate
+    frame_len = sample_rate // 10  # 100ms energy frames
     
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    chunks = []
+    start = 0
+    while len(audio) - start > chunk_len:
+        # Find the quietest frame in the last few seconds of this chunk so no word is cut
+        window_start = start + chunk_len - search_len
+        frames = audio[window_start:start + chunk_len].reshape(-1, frame_len)
+        quietest = int(np.argmin(np.square(frames).mean(axis=1)))
+        end = window_start + quietest * frame_len + frame_len // 2
+        chunks.append(audio[start:end])
+        start = end
+    chunks.append(audio[start:])
+    return chunks
+
+def transcribe_chunk(model, chunk):
+    """Transcribe one audio chunk"""
+    segments, _ = model.transcribe(chunk, beam_size=1, vad_filter=True)
+    return " ".join(segment.text.strip() for segment in segments)
 
+def download_audio(video_id, sample_rate=SAMPLE_RATE):
+    """Stream video audio through ffmpeg into a mono float32 array without touching disk"""
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    
+    downloader = decoder = None
+    # yt-dlp's stderr goes to a temp file, so its warnings can never fill a pipe and stall the download
+    with tempfile.TemporaryFile() as download_log:
+        try:
+            # yt-dlp writes the audio stream to stdout, ffmpeg decodes it to 16-bit PCM on its stdout
+            downloader = subprocess.Popen(
+                [sys.executable, "-m", "yt_dlp", *YDL_ARGS, "-o", "-", video_url],
+                stdout=subprocess.PIPE,
+                stderr=download_log
+            )
+            decoder = subprocess.Popen(
+                ["ffmpeg", "-loglevel", "error", "-i", "pipe:0",
+                 "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "pipe:1"],
+                stdin=downloader.stdout,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            # Let yt-dlp see a broken pipe if ffmpeg exits early
+            downloader.stdout.close()
+            pcm, decode_errors = decoder.communicate(timeout=AUDIO_TIMEOUT_SECONDS)
+            downloader.wait(timeout=SOCKET_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            raise Exception("Audio download timed out. Please try again or use a shorter video.")
+        finally:
+            # Never leave either process running or unreaped, whatever went wrong
+            if decoder is not None and decoder.poll() is None:
+                decoder.kill()
+                decoder.communicate()
+            if downloader is not None:
+                downloader.stdout.close()
+                if downloader.poll() is None:
+                    downloader.kill()
+                downloader.wait()
+        
+        download_log.seek(0)
+        download_errors = download_log.read()
+    
+    download_message = download_errors.decode(errors='replace').strip()
+    decode_message = decode_errors.decode(errors='replace').strip()
+    
+    # A broken pipe only means ffmpeg gave up first; its own error is the one to report
+    ffmpeg_failed_first = decoder.returncode != 0 and "Broken pipe" in download_message
+    if downloader.returncode != 0 and not ffmpeg_failed_first:
+        if "HTTP Error 429" in download_message:
+            # Fail fast rather than sleeping in the script thread while YouTube throttles us
+            raise Exception("YouTube is rate limiting audio downloads. Please try again in a few minutes.")
+        raise Exception(f"Audio download failed: {download_message}")
+    if decoder.returncode != 0:
+        raise Exception(f"Audio decoding failed: {decode_message}")
+    if not pcm:
+        raise Exception("Download failed or empty audio")
+    
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+@st.cache_data(show_spinner=False, ttl=86400, max_entries=1024)
 def transcribe_audio(video_id):
-    """Download and transcribe video audio using Whisper"""
+    """Download and transcribe video audio using Whisper (cached per video)"""
+    # Transcribe silence-split chunks in parallel and reassemble them in order
+    chunks = split_on_silence(download_audio(video_id))
+    model = load_whisper_model()
+    with ThreadPoolExecutor(max_workers=min(TRANSCRIBE_WORKERS, len(chunks))) as executor:
+        texts = executor.map(lambda chunk: transcribe_chunk(model, chunk), chunks)
+        return " ".join(texts)
+
+# Caption languages accepted as-is, in order of preference
+TRANSCRIPT_LANGUAGES = ['en', 'en-US', 'en-GB']
+
+@st.cache_data(show_spinner=False, ttl=86400, max_entries=1024)
+def fetch_youtube_transcript(video_id):
+    """Fetch the English transcript published on YouTube (cached per video)"""
     try:
-        # Get video URL
-        video_url = f"https://www.youtube.com/watch?v={video_id}"
-        
-        # Configure pytube with custom parameters
-        yt = YouTube(video_url)
-        
-        # Add retry logic for audio download
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Get the audio stream with lowest bitrate to speed up download
-                audio_stream = yt.streams.filter(only_audio=True).order_by('abr').first()
-                
-                if not audio_stream:
-                    raise Exception("No audio stream available")
-                
-                # Use a unique temporary filename
-                temp_file = f"temp_audio_{video_id}_{int(time.time())}.mp4"
-                
-                # Download with timeout
-                audio_stream.download(filename=temp_file, timeout=30)
-                
-                # Check if file exists and has size
-                if not os.path.exists(temp_file) or os.path.getsize(temp_file) == 0:
-                    raise Exception("Download failed or empty file")
-                
-                # Load Whisper model and transcribe
-                model = whisper.load_model("base")
-                result = model.transcribe(temp_file)
-                
-                # Clean up
-                os.remove(temp_file)
-                return result["text"]
-                
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    raise e
-                time.sleep(2 ** attempt)  # Exponential backoff
-                continue
-                
-    except Exception as e:
-        st.error(f"Error transcribing audio: {str(e)}")
-        return None
-    finally:
-        # Ensure cleanup even if error occurs
-        if 'temp_file' in locals() and os.path.exists(temp_file):
-            os.remove(temp_file)
+        # One request covers manual and auto-generated English captions
+        items = YouTubeTranscriptApi.get_transcript(video_id, languages=TRANSCRIPT_LANGUAGES)
+    except NoTranscriptFound:
+        # If no English transcript, translate the first one that can be translated
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        transcript = next((t for t in transcript_list if t.is_translatable), None)
+        if transcript is None:
+            raise
+        items = transcript.translate('en').fetch()
+    
+    return ' '.join(item['text'] for item in items)
 
 def get_video_transcript(video_id):
     """Get transcript from YouTube video with fallback to audio transcription"""
     try:
         # First try getting transcript through YouTube API
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        
-        # Try to get English transcript first
-        try:
-            transcript = transcript_list.find_transcript(['en'])
-        except:
-            # If no English transcript, get the first available and translate it
-            transcript = transcript_list.find_transcript(['en'])
-            transcript = transcript.translate('en')
-        
-        transcript_text = ' '.join([item['text'] for item in transcript.fetch()])
-        return transcript_text
+        return fetch_youtube_transcript(video_id)
         
     except Exception as e:
         st.info("No transcript available. Attempting to transcribe audio...")
         # Try the fallback method with additional error context
-        transcript = transcribe_audio(video_id)
+        try:
+            transcript = transcribe_audio(video_id)
+        except Exception as e:
+            st.error(f"Error transcribing audio: {str(e)}")
+            transcript = None
         if not transcript:
             st.error("""
             Unable to process video. This could be due to:
@@ -116,26 +276,62 @@ def get_video_transcript(video_id):
             """)
         return transcript
 
+@st.cache_data(show_spinner=False, ttl=86400, max_entries=1024)
+def fetch_video_details(video_id):
+    """Fetch video title and description from YouTube API (cached per video)"""
+    request = youtube.videos().list(
+        part="snippet",
+        id=video_id
+    )
+    response = request.execute()
+    
+    if response['items']:
+        snippet = response['items'][0]['snippet']
+        return {
+            'title': snippet['title'],
+            'description': snippet['description']
+        }
+    return None
+
 def get_video_details(video_id):
     """Get video title and description from YouTube API"""
     try:
-        request = youtube.videos().list(
-            part="snippet",
-            id=video_id
-        )
-        response = request.execute()
-        
-        if response['items']:
-            snippet = response['items'][0]['snippet']
-            return {
-                'title': snippet['title'],
-                'description': snippet['description']
-            }
-        return None
+        return fetch_video_details(video_id)
     except Exception as e:
         st.error(f"Error fetching video details: {str(e)}")
         return None
 
+# Cache generated articles on disk so identical requests skip OpenAI entirely
+ARTICLE_CACHE_DIR = ".article_cache"
+
+def _article_cache_path(video_id, title, style, model):
+    """Path of the cached article for an exact (video, title, style, model) match"""
+    key = hashlib.sha256(f"{video_id}|{title}|{style}|{model}".encode("utf-8")).hexdigest()
+    return os.path.join(ARTICLE_CACHE_DIR, f"{key}.md")
+
+def load_cached_article(video_id, title, style, model=MODEL):
+    """Return a previously generated article, or None on a cache miss"""
+    try:
+        with open(_article_cache_path(video_id, title, style, model), encoding="utf-8") as f:
+            # An empty file is never a valid article; treat it as a miss so it is regenerated
+            return f.read() or None
+    except FileNotFoundError:
+        return None
+
+def save_cached_article(video_id, title, style, article_content, model=MODEL):
+    """Store a generated article for later exact-match lookups"""
+    if not article_content:
+        raise ValueError("Refusing to cache an empty article")
+    os.makedirs(ARTICLE_CACHE_DIR, exist_ok=True)
+    path = _article_cache_path(video_id, title, style, model)
+    # Write to a uniquely named temp file and rename it into place, so sessions (threads of
+    # one process) saving the same article never share a temp file or read a partial one
+    with tempfile.NamedTemporaryFile(
+        mode="w", encoding="utf-8", dir=ARTICLE_CACHE_DIR, suffix=".tmp", delete=False
+    ) as f:
+        f.write(article_content)
+    os.replace(f.name, path)
+
 # Define system instructions for different styles
 SYSTEM_INSTRUCTION_DETAILED = """
 You are converting the video transcript into a detailed blog post in the speaker's voice. Follow these guidelines:
@@ -169,57 +365,285 @@ You are converting the video transcript into a concise blog post in the speaker'
 12. Simplify technical concepts while maintaining accuracy.
 """
 
-def generate_article_from_transcript(title, transcript, video_details=None, style="detailed"):
-    """Generate a blog post with specified style from the transcript and video details"""
-    
-    # Select appropriate system instruction based on style
-    system_instruction = SYSTEM_INSTRUCTION_DETAILED if style == "detailed" else SYSTEM_INSTRUCTION_CONCISE
-    
-    # Create a context-rich prompt using video details if available
-    context = ""
-    if video_details:
-        context = f"""
-        Video Title: {video_details['title']}
-        Video Description: {video_details['description']}
-        """
-    
-    summary_prompt = f"""First, summarize the key points from this transcript and context:
+# Transcripts longer than this are summarized chunk by chunk before the article is written
+LONG_TRANSCRIPT_CHARS = 40_000
+SUMMARY_CHUNK_TOKENS = 3500
+
+def split_transcript(transcript, chunk_tokens=SUMMARY_CHUNK_TOKENS):
+    """Split a transcript into pieces of at most chunk_tokens tokens"""
+    encoding = tiktoken.encoding_for_model(MODEL)
+    tokens = encoding.encode(transcript)
+    return [encoding.decode(tokens[i:i + chunk_tokens]) for i in range(0, len(tokens), chunk_tokens)]
+
+async def summarize_chunk(chunk, context):
+    """Summarize the key points of one part of a transcript"""
+    summary_prompt = f"""Summarize the key points from this part of the transcript, using the context below:
     {context}
-    Transcript excerpt: {transcript[:1500]}..."""
+    Transcript part: {chunk}"""
     
-    # Get a summary first to help with context
-    summary_response = client.chat.completions.create(
-        model="gpt-4o-2024-11-20",
+    summary_response = await client.chat.completions.create(
+        model=MODEL,
         messages=[
             {"role": "system", "content": "Summarize the key points from this video transcript and context."},
             {"role": "user", "content": summary_prompt}
         ],
-        temperature=0.7
+        temperature=0
+    )
+    return summary_response.choices[0].message.content
+
+async def summarize_transcript(transcript, context):
+    """Summarize a long transcript by summarizing its chunks concurrently, in order"""
+    partial_summaries = await gather_all(
+        summarize_chunk(chunk, context) for chunk in split_transcript(transcript)
     )
-    summary = summary_response.choices[0].message.content
+    return "\n\n".join(partial_summaries)
+
+def build_context(video_details):
+    """Describe the video for the prompts using its details, if available"""
+    if not video_details:
+        return ""
+    return f"""
+        Video Title: {video_details['title']}
+        Video Description: {video_details['description']}
+        """
+
+async def build_article_source(transcript, context):
+    """Source material for the article prompt: the transcript, or its summary when long"""
+    # Short transcripts go straight into the article prompt; long ones are replaced by their summary
+    if len(transcript) > LONG_TRANSCRIPT_CHARS:
+        summary = await summarize_transcript(transcript, context)
+        return f"Summary of content: {summary}"
+    return f"Full transcript: {transcript}"
+
+def build_article_messages(title, source, context, style="detailed"):
+    """Build the chat messages that ask for a blog post in the given style"""
     
-    # Now generate the full article
-    content_prompt = f"""Write a {'detailed' if style == 'detailed' else 'concise'} blog post with the title: '{title}'
+    # Select appropriate system instruction based on style
+    system_instruction = SYSTEM_INSTRUCTION_DETAILED if style == "detailed" else SYSTEM_INSTRUCTION_CONCISE
     
-    Context: {context}
+    # The style instruction and source material come first and the title-specific task last,
+    # so regenerations of the same video share a long prefix that OpenAI caches
+    source_prompt = f"""Context: {context}
     
-    Summary of content: {summary}
+    {source}"""
     
-    Full transcript: {transcript}
+    task_prompt = f"""Write a {'detailed' if style == 'detailed' else 'concise'} blog post with the title: '{title}'
     
     Convert this into a well-structured blog post while maintaining the speaker's voice and key insights.
     Make it {'comprehensive and detailed' if style == 'detailed' else 'concise and focused'}.
     Use proper markdown formatting and create an engaging article."""
     
-    response = client.chat.completions.create(
-        model="gpt-4o-2024-11-20",
-        messages=[
-            {"role": "system", "content": system_instruction},
-            {"role": "user", "content": content_prompt}
-        ],
-        temperature=0.7
+    return [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": source_prompt},
+        {"role": "user", "content": task_prompt}
+    ]
+
+# Minimum delay between re-renders of a streaming article
+STREAM_REFRESH_SECONDS = 0.1
+
+async def stream_article(messages, placeholder=None):
+    """Request an article and return its text
+
+    If a placeholder is given, the article is rendered into it while it streams in.
+    """
+    stream = await client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=0.7,
+        stream=True
     )
-    return response.choices[0].message.content
+    
+    # Collect tokens as they arrive, re-rendering the partial article at a bounded rate;
+    # closing the stream returns its connection to the pool even if we stop early
+    parts = []
+    last_refresh = 0.0
+    async with stream:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                if placeholder is not None and time.monotonic() - last_refresh > STREAM_REFRESH_SECONDS:
+                    placeholder.markdown("".join(parts) + "▌")
+                    last_refresh = time.monotonic()
+    
+    # e.g. the content filter ended the response before any text was produced
+    if not parts:
+        raise Exception("OpenAI returned an empty article. Please try again.")
+    return "".join(parts)
+
+async def generate_articles(title, transcript, video_details, styles, placeholders):
+    """Generate a blog post in each of the given styles concurrently, sharing one summary pass"""
+    context = build_context(video_details)
+    source = await build_article_source(transcript, context)
+    return await gather_all(
+        stream_article(build_article_messages(title, source, context, style), placeholders.get(style))
+        for style in styles
+    )
+
+async def submit_article_batch(batch_requests):
+    """Upload (custom_id, messages) pairs as a JSONL file and start an OpenAI batch for them"""
+    lines = "\n".join(
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": MODEL, "messages": messages, "temperature": 0.7}
+        })
+        for custom_id, messages in batch_requests
+    )
+    batch_file = await client.files.create(file=("batch.jsonl", lines.encode("utf-8")), purpose="batch")
+    return await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+# Batch statuses after which no more results will arrive
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+def _batch_record_failure(record):
+    """Why a batch output/error record produced no article, or None if it succeeded"""
+    response = record.get("response")
+    if record.get("error"):
+        return record["error"].get("message") or "request failed"
+    if not response:
+        return "no response"
+    if response["status_code"] != 200:
+        error = response["body"].get("error") or {}
+        return error.get("message") or f"HTTP {response['status_code']}"
+    if not response["body"]["choices"][0]["message"]["content"]:
+        return "empty article"
+    return None
+
+async def fetch_batch_results(batch_id):
+    """Return the batch, its articles keyed by custom_id, and the reasons failed requests gave"""
+    batch = await client.batches.retrieve(batch_id)
+    results = {}
+    failures = {}
+    # Successful requests land in the output file and failed ones in the error file;
+    # expired or cancelled batches can still have partial files
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        output = await client.files.content(file_id)
+        for line in output.text.splitlines():
+            record = json.loads(line)
+            failure = _batch_record_failure(record)
+            if failure:
+                failures[record["custom_id"]] = failure
+            else:
+                results[record["custom_id"]] = record["response"]["body"]["choices"][0]["message"]["content"]
+    return batch, results, failures
+
+def render_batch_mode(style):
+    """Queue many videos through the Batch API and show their articles once the batch completes"""
+    with st.expander("Batch mode: queue many videos at half the cost (results within 24 hours)"):
+        batch_input = st.text_area(
+            "YouTube Video URLs:",
+            placeholder="One URL per line, optionally followed by  | Blog Post Title",
+            help="Videos without a title use their YouTube title"
+        )
+        
+        if st.button("Queue batch"):
+            batch_requests = []
+            items = {}
+            with st.spinner("Preparing transcripts for the batch..."):
+                for line in filter(None, map(str.strip, batch_input.splitlines())):
+                    url, _, custom_title = line.partition("|")
+                    video_id = extract_video_id(url.strip())
+                    if not video_id:
+                        st.warning(f"Skipping invalid URL: {url.strip()}")
+                        continue
+                    if video_id in items:
+                        continue
+                    
+                    video_details = get_video_details(video_id)
+                    transcript = get_video_transcript(video_id)
+                    if not transcript:
+                        continue
+                    
+                    title = custom_title.strip() or (video_details['title'] if video_details else video_id)
+                    context = build_context(video_details)
+                    source = run_async(build_article_source(transcript, context))
+                    messages = build_article_messages(title, source, context, style)
+                    batch_requests.append((video_id, messages))
+                    items[video_id] = {'title': title, 'style': style}
+            
+            if batch_requests:
+                batch = run_async(submit_article_batch(batch_requests))
+                st.session_state.batch = {'id': batch.id, 'items': items}
+                st.session_state.batch_results = {}
+                st.success(f"Queued {len(batch_requests)} video(s) as batch {batch.id}.")
+            else:
+                st.warning("No videos could be queued.")
+        
+        if "batch" not in st.session_state:
+            return
+        
+        if st.button("Check batch status"):
+            batch, results, failures = run_async(fetch_batch_results(st.session_state.batch['id']))
+            # request_counts is not available while the batch is still validating
+            counts = batch.request_counts
+            if counts:
+                st.info(f"Batch {batch.id}: {batch.status} ({counts.completed}/{counts.total} completed, {counts.failed} failed)")
+            else:
+                st.info(f"Batch {batch.id}: {batch.status}")
+            # A batch that failed validation explains why here rather than per request
+            if batch.errors and batch.errors.data:
+                st.error("\n".join(error.message or error.code or "unknown error" for error in batch.errors.data))
+            
+            if batch.status in BATCH_FINAL_STATUSES:
+                for video_id in st.session_state.batch['items']:
+                    if video_id not in results and video_id not in failures:
+                        failures[video_id] = "no result returned"
+            if failures:
+                st.warning("These videos did not get an article:\n" + "\n".join(
+                    f"- {video_id}: {reason}" for video_id, reason in failures.items()
+                ))
+            for video_id, article_content in results.items():
+                item = st.session_state.batch['items'][video_id]
+                save_cached_article(video_id, item['title'], item['style'], article_content)
+            st.session_state.batch_results = results
+        
+        for video_id, article_content in st.session_state.batch_results.items():
+            item = st.session_state.batch['items'][video_id]
+            st.markdown("---")
+            st.markdown(f"## {item['title']} ({item['style'].capitalize()} Version)")
+            st.markdown(article_content)
+            st.download_button(
+                label="Download Article as Markdown",
+                data=article_content,
+                file_name=f"generated_article_{video_id}_{item['style']}.md",
+                mime="text/markdown",
+                key=f"download_batch_{video_id}"
+            )
+
+def create_result_slots(styles):
+    """One placeholder per style: a tab each when showing both styles"""
+    if len(styles) > 1:
+        tabs = st.tabs([style.capitalize() for style in styles])
+        return {style: tab.empty() for style, tab in zip(styles, tabs)}
+    return {styles[0]: st.empty()}
+
+def render_articles(articles, slots):
+    """Show each generated article with a download button in its placeholder"""
+    for style, article_content in articles.items():
+        with slots[style].container():
+            st.success("✅ Article generated successfully!")
+            
+            # Show the article in a nice format
+            st.markdown("---")
+            st.markdown(f"## Generated Article ({style.capitalize()} Version)")
+            st.markdown(article_content)
+            
+            # Add download button
+            st.download_button(
+                label="Download Article as Markdown",
+                data=article_content,
+                file_name=f"generated_article_{style}.md",
+                mime="text/markdown",
+                key=f"download_{style}"
+            )
 
 def main():
     st.set_page_config(page_title="YouTube to Blog Post Generator", page_icon="📝", layout="wide")
@@ -247,8 +671,19 @@ def main():
             help="Choose between a detailed or concise writing style"
         )
     
+    generate_both = st.checkbox(
+        "Generate both styles",
+        help="Write the detailed and concise versions at the same time, at no extra wait"
+    )
+    
+    # Results live in the session state, keyed by video, so reruns triggered by other
+    # widgets (e.g. the download button) redisplay them without any new API calls
+    for key in ("articles", "transcripts", "details"):
+        st.session_state.setdefault(key, {})
+    
     if st.button("Generate Article", type="primary"):
         if video_url and title:
+            styles = ["detailed", "concise"] if generate_both else [style]
             with st.spinner("Processing video... This may take a few minutes."):
                 # Extract video ID and get details
                 video_id = extract_video_id(video_url)
@@ -256,39 +691,52 @@ def main():
                     st.error("Invalid YouTube URL. Please check the URL and try again.")
                     return
                 
-                # Get video details
-                video_details = get_video_details(video_id)
+                # Streamed article text is shown here, then replaced by the final results
+                results = create_result_slots(styles)
                 
-                # Get transcript
-                transcript = get_video_transcript(video_id)
-                if not transcript:
-                    return
+                # Reuse articles from this session or the disk cache for identical requests
+                articles = {
+                    article_style: st.session_state.articles.get((video_id, title, article_style))
+                    or load_cached_article(video_id, title, article_style)
+                    for article_style in styles
+                }
+                missing = [article_style for article_style in styles if articles[article_style] is None]
+                if missing:
+                    # Get video details
+                    video_details = st.session_state.details.get(video_id) or get_video_details(video_id)
+                    if video_details:
+                        st.session_state.details[video_id] = video_details
+                    
+                    # Get transcript
+                    transcript = st.session_state.transcripts.get(video_id) or get_video_transcript(video_id)
+                    if not transcript:
+                        return
+                    st.session_state.transcripts[video_id] = transcript
+                    
+                    # Generate the missing styles concurrently
+                    try:
+                        generated = run_async(generate_articles(title, transcript, video_details, missing, results))
+                    except Exception as e:
+                        st.error(f"Error generating article: {str(e)}")
+                        return
+                    for article_style, article_content in zip(missing, generated):
+                        save_cached_article(video_id, title, article_style, article_content)
+                        articles[article_style] = article_content
                 
-                # Generate article with selected style
-                article_content = generate_article_from_transcript(
-                    title, 
-                    transcript, 
-                    video_details,
-                    style
-                )
+                for article_style, article_content in articles.items():
+                    st.session_state.articles[(video_id, title, article_style)] = article_content
+                st.session_state.current_articles = [(video_id, title, article_style) for article_style in styles]
             
             # Display results
-            st.success("✅ Article generated successfully!")
-            
-            # Show the article in a nice format
-            st.markdown("---")
-            st.markdown(f"## Generated Article ({style.capitalize()} Version)")
-            st.markdown(article_content)
-            
-            # Add download button
-            st.download_button(
-                label="Download Article as Markdown",
-                data=article_content,
-                file_name=f"generated_article_{style}.md",
-                mime="text/markdown"
-            )
+            render_articles(articles, results)
         else:
             st.warning("Please enter both a YouTube URL and a title.")
+    elif st.session_state.get("current_articles"):
+        # Show the last generated articles again after an unrelated rerun
+        articles = {key[2]: st.session_state.articles[key] for key in st.session_state.current_articles}
+        render_articles(articles, create_result_slots(list(articles)))
+    
+    render_batch_mode(style)
     
     # Add footer with usage instructions
     st.markdown("---")
@@ -299,9 +747,13 @@ def main():
     3. Select your preferred writing style:
         - **Detailed**: Comprehensive coverage with examples and elaboration
         - **Concise**: Brief, focused version with key points only
+        - Or tick **Generate both styles** to get both versions in separate tabs
     4. Click "Generate Article" and wait for processing
     5. Download the generated article in Markdown format
     
+    To process many videos at once, use **Batch mode**: queue the URLs, then check back
+    with "Check batch status" (batches finish within 24 hours at half the API cost).
+    
     Note: Processing time may vary depending on video length and transcript availability.
     """)
 